@@ -5,26 +5,98 @@ Allows user to enter custom search query and choose to check filesize or downloa
 
 import os
 import sys
-import json
 import csv
-import shutil
-import subprocess
+import json
+import time
+import sqlite3
+import tempfile
+import argparse
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple, Set
+from types import SimpleNamespace
+from urllib.parse import quote
 from enum import Enum
 import re
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
-    from rich.console import Console
-    from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
-    from rich.prompt import Prompt, Confirm
-    from rich.panel import Panel
-    from rich.text import Text
-    RICH_AVAILABLE = True
+    import orjson
+    
+    def json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+    
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
 except ImportError:
-    RICH_AVAILABLE = False
+    def json_loads(data: bytes) -> Any:
+        return json.loads(data)
+    
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+METADATA_URL = "https://archive.org/metadata/{item_id}"
+DOWNLOAD_URL = "https://archive.org/download/{item_id}/{filename}"
+DOWNLOAD_CHUNK_SIZE = 1 << 16  # Bytes read per streamed chunk
+# mkstemp creates files as 0600; downloads get the permissions a plain open() would have given them
+UMASK = os.umask(0o022)  # Reading the umask means setting it, so put it straight back
+os.umask(UMASK)
+FILE_MODE = 0o666 & ~UMASK
+REQUEST_RETRIES = 3
+PROGRESS_REFRESH_INTERVAL = 1 / 30  # Seconds between progress redraws
+SCRAPE_URL = "https://archive.org/services/search/v1/scrape"
+SCRAPE_PAGE_SIZE = 10000  # Maximum rows the Scrape API returns per page
+METADATA_WORKERS = 32  # Concurrent metadata requests in flight
+DOWNLOAD_WORKERS = 8  # Default number of items downloaded in parallel
+REQUEST_TIMEOUT = 30  # Seconds
+USER_AGENT = "iadownload/1.0.0"
+
+CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "iadownload" / "metadata.sqlite"
+CACHE_BUSY_TIMEOUT = 10  # Seconds to wait for another run holding the cache's write lock
+SEARCH_CACHE_MAX_AGE = 3600  # Seconds; search results change far more often than item metadata
+ERROR_LOG_SIZE = 1000  # Most recent errors kept in memory; error_count tracks the true total
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+SIZE_UNITS = ["Bytes", "KB", "MB", "GB", "TB", "PB"]
+
+ACTION_CHOICES = {"size": "1", "estimate": "1a", "download": "2"}  # --action values to menu choices
+REPORT_FORMATS = ["csv", "jsonl", "parquet"]
+
+INVALID_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+WHITESPACE_RE = re.compile(r'\s+')
+DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)([smhd])')
 
-console = Console() if RICH_AVAILABLE else None
+METADATA_FIELDS = [
+    'ItemID', 'FileName', 'title', 'creator', 'publisher', 'date',
+    'subject', 'language', 'description', 'call_number'
+]
+
+
+@functools.lru_cache(maxsize=None)
+def load_rich() -> Optional[SimpleNamespace]:
+    """Import rich on first use so scripted runs skip its import cost; None if it is not installed"""
+    try:
+        from rich.console import Console
+        from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
+        from rich.prompt import Prompt, Confirm
+    except ImportError:
+        return None
+    
+    def create_progress() -> Progress:
+        return Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TextColumn("({task.completed}/{task.total})"),
+            TimeRemainingColumn(),
+        )
+    
+    return SimpleNamespace(console=Console(), Prompt=Prompt, Confirm=Confirm, create_progress=create_progress)
 
 
 class OverwriteAction(Enum):
@@ -34,38 +106,273 @@ class OverwriteAction(Enum):
     OVERWRITE_ALL = "overwrite_all"
 
 
+class ProgressCounter:
+    """Thread-safe completion counter whose value is rendered at most once per interval"""
+    
+    def __init__(self, render: Callable[[int], None], interval: float = PROGRESS_REFRESH_INTERVAL):
+        self._render = render
+        self._interval = interval
+        self._count = 0
+        self._drawn = -1  # Last value rendered, to skip redraws when nothing changed
+        self._count_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._redraw_loop, daemon=True)
+    
+    def increment(self):
+        with self._count_lock:
+            self._count += 1
+    
+    def _draw(self):
+        if self._count == self._drawn:
+            return
+        self._drawn = self._count
+        self._render(self._drawn)
+    
+    def _redraw_loop(self):
+        while not self._stop.wait(self._interval):
+            self._draw()
+    
+    def __enter__(self) -> "ProgressCounter":
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._draw()  # Final redraw so the display reflects the true total
+
+
+def cache_operation(method: Callable) -> Callable:
+    """Treat an SQLite failure as a cache miss and switch the cache off, since it only ever saves requests"""
+    @functools.wraps(method)
+    def wrapper(self: "MetadataCache", *args, **kwargs):
+        if self._disabled:
+            return None
+        try:
+            return method(self, *args, **kwargs)
+        except sqlite3.Error as e:
+            with self._lock:
+                first_failure = not self._disabled
+                self._disabled = True
+            if first_failure and self._on_error:
+                self._on_error(e)
+            return None
+    return wrapper
+
+
+class MetadataCache:
+    """SQLite store of item metadata and search results, shared across runs and safe to use from worker threads"""
+    
+    def __init__(self, path: Path, on_error: Optional[Callable[[Exception], None]] = None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._on_error = on_error  # Called once, on the first failure after opening
+        self._disabled = False
+        self._conn = sqlite3.connect(str(path), timeout=CACHE_BUSY_TIMEOUT, check_same_thread=False)
+        # WAL lets concurrent runs read while one of them writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "item_id TEXT PRIMARY KEY, etag TEXT, json_blob BLOB NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scrape ("
+                "query TEXT NOT NULL, fields TEXT NOT NULL, json_blob BLOB NOT NULL, fetched_at REAL NOT NULL, "
+                "PRIMARY KEY (query, fields))"
+            )
+    
+    @cache_operation
+    def get(self, item_id: str) -> Optional[Tuple[Optional[str], Dict[str, Any], float]]:
+        """Return (etag, metadata, fetched_at) for a cached item, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, json_blob, fetched_at FROM metadata WHERE item_id = ?", (item_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, json_blob, fetched_at = row
+        return etag, json_loads(json_blob), fetched_at
+    
+    @cache_operation
+    def put(self, item_id: str, etag: Optional[str], metadata: Dict[str, Any]):
+        """Insert or replace the cached metadata for an item"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (item_id, etag, json_blob, fetched_at) VALUES (?, ?, ?, ?)",
+                (item_id, etag, json_dumps(metadata), time.time())
+            )
+    
+    @cache_operation
+    def touch(self, item_id: str):
+        """Mark a cached item as freshly validated without rewriting its metadata"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE metadata SET fetched_at = ? WHERE item_id = ?", (time.time(), item_id))
+    
+    @cache_operation
+    def get_scrape(self, query: str, fields: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """Return (rows, fetched_at) for a cached search, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT json_blob, fetched_at FROM scrape WHERE query = ? AND fields = ?", (query, fields)
+            ).fetchone()
+        if row is None:
+            return None
+        json_blob, fetched_at = row
+        return json_loads(json_blob), fetched_at
+    
+    @cache_operation
+    def put_scrape(self, query: str, fields: str, rows: List[Dict[str, Any]]):
+        """Insert or replace the cached rows for a search"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape (query, fields, json_blob, fetched_at) VALUES (?, ?, ?, ?)",
+                (query, fields, json_dumps(rows), time.time())
+            )
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class IADownloader:
-    def __init__(self):
-        self.error_log = []
+    def __init__(self, use_cache: bool = True, refresh_older_than: float = 7 * 86400, jobs: int = DOWNLOAD_WORKERS,
+                 assume_yes: bool = False, conflict_action: Optional[OverwriteAction] = None):
+        self.error_log: deque = deque(maxlen=ERROR_LOG_SIZE)
+        self.error_count = 0
+        self._error_lock = threading.Lock()
+        self.item_formats: Dict[str, List[str]] = {}  # File formats per item, from search results
+        self.item_total_sizes: Dict[str, int] = {}  # Size of all files per item, from search results
         self.overwrite_action = None  # Will store OverwriteAction for "all" choices
+        self.conflict_action = conflict_action  # Answer to use for every existing file instead of prompting
+        self.assume_yes = assume_yes  # Skip confirmation prompts
+        self.jobs = jobs  # Number of items downloaded in parallel
+        self._cancelled = threading.Event()  # Set on Ctrl-C so running workers stop at the next chunk or file
+        self.refresh_older_than = refresh_older_than  # Seconds before cached metadata is refetched
+        self._metadata_memo: Dict[str, Dict[str, Any]] = {}  # In-process hits, checked before the disk cache
+        self.cache: Optional[MetadataCache] = None
+        self._session = self._create_session()
+        
+        if use_cache:
+            try:
+                self.cache = MetadataCache(CACHE_PATH, self._cache_failed)
+            except (OSError, sqlite3.Error) as e:
+                self.print_colored(f"Metadata cache unavailable ({e}); continuing without it.", "yellow")
+        
+    def _cache_failed(self, error: Exception):
+        """Report a cache that stopped working mid-run; lookups carry on uncached"""
+        self.print_colored(f"Metadata cache error ({error}); continuing without it.", "yellow")
+    
+    def _create_session(self) -> requests.Session:
+        """Create the keep-alive HTTP session shared by every search, metadata and download request"""
+        pool_size = max(METADATA_WORKERS, self.jobs)
+        adapter_kwargs = {
+            'pool_connections': pool_size,
+            'pool_maxsize': pool_size,
+            'max_retries': Retry(total=REQUEST_RETRIES, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]),
+        }
         
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        try:
+            import internetarchive
+        except ImportError:
+            pass  # Public items need no credentials
+        else:
+            # Copy the credentials from 'ia configure' (cookies) and the library's headers, so restricted items
+            # work too. ArchiveSession itself is not used for requests: its send() wraps every call in
+            # warnings.catch_warnings(), which is not thread-safe.
+            ia_session = internetarchive.get_session()
+            session.cookies.update(ia_session.cookies)
+            session.headers.update(ia_session.headers)
+            session.headers['User-Agent'] = f"{ia_session.headers['User-Agent']} {USER_AGENT}"
+            # ArchiveSession asks for 'Connection: close' on every request, which defeats keep-alive
+            session.headers.pop('Connection', None)
+            ia_session.close()
+        
+        # Downloads are redirected to data nodes (e.g. ia800100.us.archive.org), which need a pool too
+        session.mount("https://", HTTPAdapter(**adapter_kwargs))
+        return session
+    
+    def close(self):
+        """Release the HTTP session and the metadata cache"""
+        self._session.close()
+        if self.cache:
+            self.cache.close()
+    
+    def log_error(self, message: str):
+        """Record an error, keeping only the most recent messages but counting all of them"""
+        with self._error_lock:
+            self.error_log.append(message)
+            self.error_count += 1
+    
+    def _size_unit_index(self, bytes_size: int) -> int:
+        """Index into SIZE_UNITS of the largest unit not exceeding bytes_size"""
+        return min(len(SIZE_UNITS) - 1, (bytes_size.bit_length() - 1) // 10)
+    
     def format_file_size(self, bytes_size: int) -> str:
         """Format file size in human readable format"""
         if bytes_size <= 0:
             return "0 Bytes"
         
-        units = ["Bytes", "KB", "MB", "GB", "TB", "PB"]
-        power = min(len(units) - 1, int(bytes_size.bit_length() - 1) // 10)
+        power = self._size_unit_index(bytes_size)
         size = bytes_size / (1024 ** power)
-        return f"{size:.2f} {units[power]}"
+        return f"{size:.2f} {SIZE_UNITS[power]}"
+    
+    def print_size_statistics(self, sizes: List[int]):
+        """Print min/max/mean item size and a per-unit histogram, in one pass over the sizes"""
+        if not sizes:
+            return
+        
+        smallest = largest = sizes[0]
+        histogram = [0] * len(SIZE_UNITS)
+        for size in sizes:
+            if size < smallest:
+                smallest = size
+            elif size > largest:
+                largest = size
+            histogram[self._size_unit_index(size) if size > 0 else 0] += 1
+        
+        print(f"Smallest Item: {self.format_file_size(smallest)}")
+        print(f"Largest Item: {self.format_file_size(largest)}")
+        print(f"Average Item: {self.format_file_size(sum(sizes) // len(sizes))}")
+        print("Items by Size:")
+        for power, count in enumerate(histogram):
+            if not count:
+                continue
+            if power == 0:
+                label = f"< 1 {SIZE_UNITS[1]}"
+            elif power == len(SIZE_UNITS) - 1:
+                label = f">= 1 {SIZE_UNITS[power]}"
+            else:
+                label = f"1 {SIZE_UNITS[power]} - 1 {SIZE_UNITS[power + 1]}"
+            print(f"  {label}: {count}")
     
     def print_colored(self, text: str, color: str = "white"):
         """Print colored text using rich if available, otherwise plain text"""
-        if RICH_AVAILABLE:
-            console.print(text, style=color)
+        rich = load_rich()
+        if rich:
+            rich.console.print(text, style=color)
         else:
             print(text)
     
+    def _print_progress(self, label: str, completed: int, total: int):
+        """Write a single-line text progress indicator for when rich is unavailable"""
+        if total:
+            sys.stdout.write(f"\r{label} [{completed}/{total}] {completed/total*100:.0f}%")
+            sys.stdout.flush()
+    
     def get_search_query(self) -> str:
         """Get search query from user with examples"""
-        if RICH_AVAILABLE:
-            console.print("=== Internet Archive Download Script ===", style="cyan bold")
-            console.print()
-            console.print("Examples of search queries:", style="yellow")
-            console.print('  title:("Statutes of the Province of Ontario") AND collection:(ontario_council_university_libraries)')
-            console.print('  creator:"Ontario" AND mediatype:texts')
-            console.print('  collection:americana AND date:[1800 TO 1900]')
-            console.print()
+        rich = load_rich()
+        if rich:
+            rich.console.print("=== Internet Archive Download Script ===", style="cyan bold")
+            rich.console.print()
+            rich.console.print("Examples of search queries:", style="yellow")
+            rich.console.print('  title:("Statutes of the Province of Ontario") AND collection:(ontario_council_university_libraries)')
+            rich.console.print('  creator:"Ontario" AND mediatype:texts')
+            rich.console.print('  collection:americana AND date:[1800 TO 1900]')
+            rich.console.print()
         else:
             print("=== Internet Archive Download Script ===")
             print()
@@ -76,8 +383,8 @@ class IADownloader:
             print()
         
         while True:
-            if RICH_AVAILABLE:
-                query = Prompt.ask("Enter your Internet Archive search query")
+            if rich:
+                query = rich.Prompt.ask("Enter your Internet Archive search query")
             else:
                 query = input("Enter your Internet Archive search query: ")
             
@@ -86,41 +393,44 @@ class IADownloader:
             
             self.print_colored("Please enter a valid search query.", "red")
     
-    def get_user_action(self) -> int:
+    def get_user_action(self) -> str:
         """Get user's choice of action"""
-        if RICH_AVAILABLE:
-            console.print()
-            console.print("Choose an action:", style="yellow")
-            console.print("1. Check total PDF file size only")
-            console.print("2. Download PDFs and create metadata CSV")
-            console.print()
+        rich = load_rich()
+        if rich:
+            rich.console.print()
+            rich.console.print("Choose an action:", style="yellow")
+            rich.console.print("1.  Check total PDF file size only")
+            rich.console.print("1a. Quick estimate of total size (all file types, no per-item lookups)")
+            rich.console.print("2.  Download PDFs and create metadata CSV")
+            rich.console.print()
             
             while True:
-                choice = Prompt.ask("Enter your choice", choices=["1", "2"])
-                return int(choice)
+                return rich.Prompt.ask("Enter your choice", choices=["1", "1a", "2"])
         else:
             print()
             print("Choose an action:")
-            print("1. Check total PDF file size only")
-            print("2. Download PDFs and create metadata CSV")
+            print("1.  Check total PDF file size only")
+            print("1a. Quick estimate of total size (all file types, no per-item lookups)")
+            print("2.  Download PDFs and create metadata CSV")
             print()
             
             while True:
-                choice = input("Enter your choice (1 or 2): ").strip()
-                if choice in ["1", "2"]:
-                    return int(choice)
-                print("Please enter 1 or 2.")
+                choice = input("Enter your choice (1, 1a or 2): ").strip().lower()
+                if choice in ["1", "1a", "2"]:
+                    return choice
+                print("Please enter 1, 1a or 2.")
     
     def get_download_directory(self) -> str:
         """Get download directory from user"""
-        if RICH_AVAILABLE:
-            console.print()
-            console.print("Download Directory Options:", style="yellow")
-            console.print("  - Press Enter to download to current directory")
-            console.print("  - Or enter a folder name to create/use a subdirectory")
-            console.print()
+        rich = load_rich()
+        if rich:
+            rich.console.print()
+            rich.console.print("Download Directory Options:", style="yellow")
+            rich.console.print("  - Press Enter to download to current directory")
+            rich.console.print("  - Or enter a folder name to create/use a subdirectory")
+            rich.console.print()
             
-            dir_name = Prompt.ask("Enter download directory name (or press Enter for current directory)", default="")
+            dir_name = rich.Prompt.ask("Enter download directory name (or press Enter for current directory)", default="")
         else:
             print()
             print("Download Directory Options:")
@@ -130,12 +440,16 @@ class IADownloader:
             
             dir_name = input("Enter download directory name (or press Enter for current directory): ")
         
+        return self.prepare_download_directory(dir_name)
+    
+    def prepare_download_directory(self, dir_name: str) -> str:
+        """Clean a directory name and create it under the current directory, falling back to the current directory"""
         if not dir_name.strip():
             return os.getcwd()
         
         # Clean the directory name for invalid characters
-        clean_dir_name = re.sub(r'[<>:"/\\|?*]', '_', dir_name.strip())
-        clean_dir_name = re.sub(r'\s+', '_', clean_dir_name)
+        clean_dir_name = INVALID_CHARS_RE.sub('_', dir_name.strip())
+        clean_dir_name = WHITESPACE_RE.sub('_', clean_dir_name)
         clean_dir_name = clean_dir_name.strip('_')
         
         full_path = os.path.join(os.getcwd(), clean_dir_name)
@@ -150,32 +464,64 @@ class IADownloader:
         
         return full_path
     
-    def check_ia_command(self) -> bool:
-        """Check if Internet Archive CLI is available"""
-        try:
-            subprocess.run(["ia", "--version"], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+    def scrape(self, query: str, fields: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield every search result row from the Scrape API, following the paging cursor"""
+        field_list = ','.join(fields)
+        
+        if self.cache:
+            cached = self.cache.get_scrape(query, field_list)
+            # New uploads show up in searches, so results go stale much sooner than an item's metadata
+            max_age = min(self.refresh_older_than, SEARCH_CACHE_MAX_AGE)
+            if cached and time.time() - cached[1] < max_age:
+                yield from cached[0]
+                return
+        
+        params = {'q': query, 'fields': field_list, 'count': SCRAPE_PAGE_SIZE}
+        rows = []
+        
+        while True:
+            response = self._session.get(SCRAPE_URL, params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            page = json_loads(response.content)
+            if 'error' in page:
+                raise ValueError(page['error'])
+            
+            items = page.get('items', [])
+            rows.extend(items)
+            yield from items
+            
+            cursor = page.get('cursor')
+            if not cursor:
+                break
+            params['cursor'] = cursor
+        
+        if self.cache:
+            self.cache.put_scrape(query, field_list, rows)
     
     def search_items(self, query: str) -> List[str]:
         """Search Internet Archive and return list of item IDs"""
         try:
-            # Pass query as single quoted argument to preserve complex search syntax
-            result = subprocess.run(
-                ["ia", "search", query, "--itemlist"],
-                capture_output=True,
-                text=True,
-                check=True,
-                shell=False
-            )
-            items = [item.strip() for item in result.stdout.strip().split('\n') if item.strip()]
+            items = []
+            for row in self.scrape(query, ['identifier', 'format', 'item_size']):
+                item_id = row['identifier']
+                formats = row.get('format') or []
+                items.append(item_id)
+                # Items that are not derived yet have no formats; leave those unknown rather than PDF-less
+                if formats:
+                    self.item_formats[item_id] = [formats] if isinstance(formats, str) else formats
+                self.item_total_sizes[item_id] = int(row.get('item_size') or 0)
             return items
-        except subprocess.CalledProcessError as e:
+        except (requests.RequestException, ValueError) as e:
             self.print_colored(f"Error searching Internet Archive: {e}", "red")
-            self.print_colored(f"Command output: {e.stderr if e.stderr else 'No error output'}", "red")
             return []
     
+    def items_with_pdfs(self, item_list: List[str]) -> List[str]:
+        """Drop items whose search result lists formats but no PDF, so their metadata is never fetched"""
+        return [
+            item_id for item_id in item_list
+            if not self.item_formats.get(item_id) or any('PDF' in fmt for fmt in self.item_formats[item_id])
+        ]
+    
     def prompt_overwrite_action(self, filename: str, progress=None, task=None) -> OverwriteAction:
         """Prompt user for overwrite action when file exists"""
         # Pause progress display if provided
@@ -193,7 +539,12 @@ class IADownloader:
         print()
         
         while True:
-            choice = input("Enter your choice (1-4, default 1): ").strip()
+            try:
+                choice = input("Enter your choice (1-4, default 1): ").strip()
+            except EOFError:
+                # No one to answer (e.g. stdin is /dev/null in an unattended run), so take the default
+                print()
+                choice = ""
             if not choice:
                 choice = "1"
             if choice in ["1", "2", "3", "4"]:
@@ -220,108 +571,191 @@ class IADownloader:
         return action
 
     def get_item_metadata(self, item_id: str) -> Optional[Dict[str, Any]]:
-        """Get metadata for a specific item"""
+        """Get metadata for a specific item, preferring the in-process and on-disk caches"""
+        if item_id in self._metadata_memo:
+            return self._metadata_memo[item_id]
+        
+        cached = self.cache.get(item_id) if self.cache else None
+        if cached and time.time() - cached[2] < self.refresh_older_than:
+            self._metadata_memo[item_id] = cached[1]
+            return cached[1]
+        
+        # Revalidate stale entries so unchanged items come back as an empty 304
+        headers = {'If-None-Match': cached[0]} if cached and cached[0] else None
+        
         try:
-            result = subprocess.run(
-                ["ia", "metadata", item_id],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return json.loads(result.stdout)
-        except (subprocess.CalledProcessError, json.JSONDecodeError):
-            return None
+            response = self._session.get(METADATA_URL.format(item_id=item_id), headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304 and cached:
+                self.cache.touch(item_id)
+                self._metadata_memo[item_id] = cached[1]
+                return cached[1]
+            response.raise_for_status()
+            # The metadata API returns an empty object for unknown items
+            metadata = json_loads(response.content) or None
+        except (requests.RequestException, ValueError) as e:
+            if not cached:
+                return None
+            # A stale copy beats none at all when the archive cannot be reached
+            self.log_error(f"Could not revalidate metadata for item: {item_id}; using cached copy. Error: {e}")
+            self._metadata_memo[item_id] = cached[1]
+            return cached[1]
+        
+        if metadata:
+            self._metadata_memo[item_id] = metadata
+            if self.cache:
+                self.cache.put(item_id, response.headers.get('ETag'), metadata)
+        return metadata
+    
+    def fetch_all_metadata(self, item_list: List[str], on_complete: Optional[Callable[[], None]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch metadata for all items concurrently, calling on_complete as each finishes"""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        
+        executor = ThreadPoolExecutor(max_workers=METADATA_WORKERS)
+        futures = {executor.submit(self.get_item_metadata, item_id): item_id for item_id in item_list}
+        try:
+            for future in as_completed(futures):
+                item_id = futures[future]
+                try:
+                    results[item_id] = future.result()
+                except Exception as e:
+                    self.log_error(f"Failed to get metadata for item: {item_id}. Error: {e}")
+                    results[item_id] = None
+                
+                if on_complete:
+                    on_complete()
+        except BaseException:
+            self._abort_pool(executor, futures)
+            raise
+        
+        executor.shutdown()
+        return results
     
-    def get_total_file_size(self, search_query: str, item_list: List[str]):
-        """Calculate total file size of PDFs for all items"""
+    def _abort_pool(self, executor: ThreadPoolExecutor, futures):
+        """Cancel queued work after an interrupt instead of letting shutdown() run every remaining item"""
+        self._cancelled.set()
+        # Done by hand because shutdown(cancel_futures=True) needs Python 3.9
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    
+    def get_total_file_size(self, search_query: str, item_list: List[str], output_format: Optional[str] = None):
+        """Calculate total file size of PDFs for all items, exporting the report when output_format is given"""
+        rich = load_rich()
         self.print_colored("\nCalculating total PDF file sizes...", "green")
         
         total_size = 0
+        total_pdf_count = 0
         item_sizes = []
+        pdf_items = self.items_with_pdfs(item_list)
         
-        if RICH_AVAILABLE:
-            with Progress(
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                TextColumn("({task.completed}/{task.total})"),
-                TimeRemainingColumn(),
-            ) as progress:
-                task = progress.add_task("Checking", total=len(item_list))
-                
-                for item_id in item_list:
-                    try:
-                        metadata = self.get_item_metadata(item_id)
-                        if metadata:
-                            pdf_files = [f for f in metadata.get('files', []) if f.get('name', '').endswith('.pdf')]
-                            item_size = sum(int(f.get('size', 0)) for f in pdf_files)
-                            total_size += item_size
-                            
-                            item_sizes.append({
-                                'Item ID': item_id,
-                                'Title': metadata.get('metadata', {}).get('title', ''),
-                                'PDF Count': len(pdf_files),
-                                'Size (Bytes)': item_size,
-                                'Size (Formatted)': self.format_file_size(item_size)
-                            })
-                    except Exception as e:
-                        self.error_log.append(f"Failed to get metadata for item: {item_id}. Error: {e}")
-                    
-                    progress.advance(task)
+        if rich:
+            with rich.create_progress() as progress:
+                task = progress.add_task("Checking", total=len(pdf_items))
+                with ProgressCounter(lambda n: progress.update(task, completed=n)) as counter:
+                    all_metadata = self.fetch_all_metadata(pdf_items, counter.increment)
         else:
-            for i, item_id in enumerate(item_list, 1):
-                print(f"\rChecking [{i}/{len(item_list)}] {i/len(item_list)*100:.0f}%", end="", flush=True)
-                
-                try:
-                    metadata = self.get_item_metadata(item_id)
-                    if metadata:
-                        pdf_files = [f for f in metadata.get('files', []) if f.get('name', '').endswith('.pdf')]
-                        item_size = sum(int(f.get('size', 0)) for f in pdf_files)
-                        total_size += item_size
-                        
-                        item_sizes.append({
-                            'Item ID': item_id,
-                            'Title': metadata.get('metadata', {}).get('title', ''),
-                            'PDF Count': len(pdf_files),
-                            'Size (Bytes)': item_size,
-                            'Size (Formatted)': self.format_file_size(item_size)
-                        })
-                except Exception as e:
-                    self.error_log.append(f"Failed to get metadata for item: {item_id}. Error: {e}")
+            with ProgressCounter(lambda n: self._print_progress("Checking", n, len(pdf_items))) as counter:
+                all_metadata = self.fetch_all_metadata(pdf_items, counter.increment)
             print("\nSize calculation complete!")
         
-        if self.error_log:
-            self.print_colored(f"\nEncountered {len(self.error_log)} errors:", "red")
-            for error in self.error_log[-5:]:  # Show last 5 errors
+        for item_id in pdf_items:
+            metadata = all_metadata.get(item_id)
+            if not metadata:
+                continue
+            
+            try:
+                # Single pass over the file list without building an intermediate list of PDFs
+                pdf_count = 0
+                item_size = 0
+                for f in metadata.get('files', ()):
+                    if f.get('name', '').endswith('.pdf'):
+                        pdf_count += 1
+                        item_size += int(f.get('size', 0))
+                
+                item_sizes.append({
+                    'Item ID': item_id,
+                    'Title': metadata.get('metadata', {}).get('title', ''),
+                    'PDF Count': pdf_count,
+                    'Size (Bytes)': item_size,
+                    'Size (Formatted)': self.format_file_size(item_size)
+                })
+            except Exception as e:
+                self.log_error(f"Failed to get file sizes for item: {item_id}. Error: {e}")
+                continue
+            
+            total_size += item_size
+            total_pdf_count += pdf_count
+        
+        if self.error_count:
+            self.print_colored(f"\nEncountered {self.error_count} errors:", "red")
+            for error in list(self.error_log)[-5:]:  # Show last 5 errors
                 self.print_colored(f" - {error}", "red")
-            if len(self.error_log) > 5:
-                self.print_colored(f" ... and {len(self.error_log) - 5} more", "red")
+            if self.error_count > 5:
+                self.print_colored(f" ... and {self.error_count - 5} more", "red")
         
         # Display summary
         self.print_colored("\n=== File Size Summary ===", "green")
         print(f"Search Query: {search_query}")
         print(f"Total Items Scanned: {len(item_list)}")
-        print(f"Total PDF Files: {sum(item['PDF Count'] for item in item_sizes)}")
+        print(f"Total PDF Files: {total_pdf_count}")
         print(f"Total Size: {self.format_file_size(total_size)}")
+        self.print_size_statistics([item['Size (Bytes)'] for item in item_sizes if item['PDF Count']])
         print()
         
-        # Export report option
-        if RICH_AVAILABLE:
-            export_report = Confirm.ask("Export detailed size report to CSV?")
-        else:
-            export_report = input("Export detailed size report to CSV? (y/n): ").lower().startswith('y')
+        # Export report option; "none" answers the prompt with no
+        if output_format == "none":
+            return
+        if output_format is None:
+            if rich:
+                export_report = rich.Confirm.ask("Export detailed size report to CSV?")
+            else:
+                export_report = input("Export detailed size report to CSV? (y/n): ").lower().startswith('y')
+            if not export_report:
+                return
+            output_format = "csv"
         
-        if export_report:
-            csv_path = os.path.join(os.getcwd(), "filesize_report.csv")
-            with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+        self.export_size_report(item_sizes, output_format)
+    
+    def export_size_report(self, item_sizes: List[Dict[str, Any]], output_format: str):
+        """Write the per-item size report to the current directory as CSV, JSON Lines or Parquet"""
+        report_path = os.path.join(os.getcwd(), f"filesize_report.{output_format}")
+        
+        if output_format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                self.print_colored("Parquet output requires pyarrow. Install it with: pip install pyarrow", "red")
+                return
+            pyarrow.parquet.write_table(pyarrow.Table.from_pylist(item_sizes), report_path)
+        elif output_format == "jsonl":
+            with open(report_path, 'wb') as jsonfile:
+                for item in item_sizes:
+                    jsonfile.write(json_dumps(item) + b"\n")
+        else:
+            with open(report_path, 'w', newline='', encoding='utf-8') as csvfile:
                 if item_sizes:
                     writer = csv.DictWriter(csvfile, fieldnames=item_sizes[0].keys())
                     writer.writeheader()
                     writer.writerows(item_sizes)
-            self.print_colored(f"Size report exported to: {csv_path}", "green")
+        
+        self.print_colored(f"Size report exported to: {report_path}", "green")
+    
+    def estimate_total_size(self, search_query: str, item_list: List[str]):
+        """Sum the per-item sizes returned with the search results, without fetching any metadata"""
+        total_size = sum(self.item_total_sizes.get(item_id, 0) for item_id in item_list)
+        
+        self.print_colored("\n=== Quick Size Estimate ===", "green")
+        print(f"Search Query: {search_query}")
+        print(f"Total Items: {len(item_list)}")
+        print(f"Total Size (all file types): {self.format_file_size(total_size)}")
+        self.print_size_statistics([self.item_total_sizes.get(item_id, 0) for item_id in item_list])
+        self.print_colored("Note: this counts every file in each item, not just PDFs. "
+                           "Choose option 1 for the exact PDF total.", "yellow")
     
     def download_files_and_create_metadata(self, search_query: str, item_list: List[str], download_dir: str):
         """Download PDFs and create metadata CSV"""
+        rich = load_rich()
         download_location = "Current directory" if download_dir == os.getcwd() else f"Directory: {download_dir}"
         
         self.print_colored("\nDownload Settings:", "green")
@@ -330,8 +764,10 @@ class IADownloader:
         print(f"  Download location: {download_location}")
         print()
         
-        if RICH_AVAILABLE:
-            if not Confirm.ask("Proceed with download?"):
+        if self.assume_yes:
+            pass
+        elif rich:
+            if not rich.Confirm.ask("Proceed with download?"):
                 self.print_colored("Download cancelled.", "yellow")
                 return
         else:
@@ -340,162 +776,205 @@ class IADownloader:
                 self.print_colored("Download cancelled.", "yellow")
                 return
         
-        all_metadata = []
+        csv_path = os.path.join(download_dir, "internet_archive_metadata.csv")
+        rows_written = 0
         
         self.print_colored("\nStarting download and metadata collection...", "green")
         
-        if RICH_AVAILABLE:
-            with Progress(
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                TextColumn("({task.completed}/{task.total})"),
-                TimeRemainingColumn(),
-            ) as progress:
-                task = progress.add_task("Downloading", total=len(item_list))
+        # Rows are written as each item finishes so partial results survive an interrupted run. They go to a
+        # temporary file that only replaces the CSV once it has rows, so an empty run keeps the previous one.
+        fd, tmp_path = tempfile.mkstemp(dir=download_dir, suffix=".csv.part")
+        try:
+            with open(fd, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=METADATA_FIELDS)
+                writer.writeheader()
+                csv_lock = threading.Lock()
                 
-                for item_id in item_list:
-                    self._process_item_download(item_id, download_dir, all_metadata, progress, task)
-                    progress.advance(task)
-        else:
-            for i, item_id in enumerate(item_list, 1):
-                print(f"\rDownloading [{i}/{len(item_list)}] {i/len(item_list)*100:.0f}%", end="", flush=True)
-                self._process_item_download(item_id, download_dir, all_metadata)
-            print("\nDownload and metadata collection complete!")
-        
-        if self.error_log:
-            self.print_colored(f"\nEncountered {len(self.error_log)} errors during download:", "red")
-            for error in self.error_log[-5:]:  # Show last 5 errors
+                def record_rows(rows: List[Dict[str, Any]]):
+                    nonlocal rows_written
+                    with csv_lock:
+                        writer.writerows(rows)
+                        csvfile.flush()
+                        rows_written += len(rows)
+                
+                if rich:
+                    with rich.create_progress() as progress:
+                        metadata_task = progress.add_task("Fetching metadata", total=len(item_list))
+                        with ProgressCounter(lambda n: progress.update(metadata_task, completed=n)) as counter:
+                            item_metadata = self.fetch_all_metadata(item_list, counter.increment)
+                    
+                    downloads = self._plan_downloads(item_list, item_metadata, download_dir)
+                    
+                    with rich.create_progress() as progress:
+                        task = progress.add_task("Downloading", total=len(item_list))
+                        with ProgressCounter(lambda n: progress.update(task, completed=n)) as counter:
+                            self._download_items(item_list, item_metadata, downloads, download_dir, record_rows,
+                                                 counter.increment)
+                else:
+                    with ProgressCounter(lambda n: self._print_progress("Fetching metadata", n, len(item_list))) as counter:
+                        item_metadata = self.fetch_all_metadata(item_list, counter.increment)
+                    print()
+                    
+                    downloads = self._plan_downloads(item_list, item_metadata, download_dir)
+                    
+                    with ProgressCounter(lambda n: self._print_progress("Downloading", n, len(item_list))) as counter:
+                        self._download_items(item_list, item_metadata, downloads, download_dir, record_rows,
+                                             counter.increment)
+                    print("\nDownload and metadata collection complete!")
+        finally:
+            if rows_written:
+                os.chmod(tmp_path, FILE_MODE)
+                os.replace(tmp_path, csv_path)
+            else:
+                os.remove(tmp_path)
+        
+        if self.error_count:
+            self.print_colored(f"\nEncountered {self.error_count} errors during download:", "red")
+            for error in list(self.error_log)[-5:]:  # Show last 5 errors
                 self.print_colored(f" - {error}", "red")
-            if len(self.error_log) > 5:
-                self.print_colored(f" ... and {len(self.error_log) - 5} more", "red")
-        
-        if all_metadata:
-            csv_path = os.path.join(download_dir, "internet_archive_metadata.csv")
-            with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                if all_metadata:
-                    writer = csv.DictWriter(csvfile, fieldnames=all_metadata[0].keys())
-                    writer.writeheader()
-                    writer.writerows(all_metadata)
-            
+            if self.error_count > 5:
+                self.print_colored(f" ... and {self.error_count - 5} more", "red")
+        
+        if rows_written:
             self.print_colored("\n=== Download Summary ===", "green")
-            print(f"Successfully processed {len(all_metadata)} files from {len(item_list)} items.")
+            print(f"Successfully processed {rows_written} files from {len(item_list)} items.")
             print(f"PDFs saved to: {download_dir}")
             print(f"Metadata file created: {csv_path}")
         else:
             self.print_colored("No items were successfully processed or downloaded.", "red")
     
-    def _process_item_download(self, item_id: str, download_dir: str, all_metadata: List[Dict], progress=None, task=None):
-        """Process download for a single item"""
+    @staticmethod
+    def _pdf_names(metadata: Dict[str, Any]) -> List[str]:
+        """Names of the PDF files listed in an item's metadata"""
+        return [name for name in (f.get('name', '') for f in metadata.get('files', ())) if name.endswith('.pdf')]
+    
+    def _plan_downloads(self, item_list: List[str], item_metadata: Dict[str, Optional[Dict[str, Any]]],
+                        download_dir: str) -> Dict[str, List[str]]:
+        """Choose the PDFs to fetch for each item, resolving every conflict before any download starts.
+        
+        Prompting here on the main thread keeps Ctrl-C responsive and means workers never wait on the user.
+        """
+        # One directory scan up front replaces a stat per candidate file
+        with os.scandir(download_dir) as entries:
+            existing_files = {entry.name for entry in entries if entry.is_file(follow_symlinks=False)}
+        
+        downloads: Dict[str, List[str]] = {}
+        for item_id in item_list:
+            metadata = item_metadata.get(item_id)
+            # If user selected "Skip All", don't download anything; metadata is still recorded by the workers
+            if not metadata or self.overwrite_action == OverwriteAction.SKIP_ALL:
+                continue
+            
+            selected = []
+            for pdf_file in self._pdf_names(metadata):
+                # Files inside item subfolders are not in the top-level scan, so stat those directly
+                exists = pdf_file in existing_files or ('/' in pdf_file and os.path.exists(os.path.join(download_dir, pdf_file)))
+                # A name an earlier item will download counts as existing, so two items never fetch the same file unasked
+                existing_files.add(pdf_file)
+                if exists:
+                    if self.overwrite_action != OverwriteAction.OVERWRITE_ALL:
+                        action = self.conflict_action or self.prompt_overwrite_action(pdf_file)
+                        
+                        if action == OverwriteAction.SKIP:
+                            continue
+                        if action == OverwriteAction.SKIP_ALL:
+                            break  # Skip this file and all future ones
+                        # OVERWRITE or OVERWRITE_ALL: download over the existing file
+                selected.append(pdf_file)
+            
+            if selected:
+                downloads[item_id] = selected
+        return downloads
+    
+    def _download_items(self, item_list: List[str], item_metadata: Dict[str, Optional[Dict[str, Any]]],
+                        downloads: Dict[str, List[str]], download_dir: str,
+                        record_rows: Callable[[List[Dict[str, Any]]], None], on_complete: Callable[[], None]):
+        """Download the planned PDFs in parallel, calling on_complete as each item finishes"""
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        # Popping hands each item's metadata to its worker, so it is released as soon as that item is done
+        futures = [
+            executor.submit(self._process_item_download, item_id, item_metadata.pop(item_id, None),
+                            downloads.get(item_id, []), download_dir, record_rows)
+            for item_id in item_list
+        ]
+        try:
+            for _ in as_completed(futures):
+                on_complete()
+        except BaseException:
+            self._abort_pool(executor, futures)
+            raise
+        
+        executor.shutdown()
+    
+    def _download_pdf(self, item_id: str, filename: str, dst: str):
+        """Stream a single file from the item straight into place, via a partial file of its own"""
+        url = DOWNLOAD_URL.format(item_id=item_id, filename=quote(filename))
+        # Only files inside item subfolders need a directory created; the download directory already exists
+        if '/' in filename:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+        # A unique partial file per transfer, so two items shipping the same name never write into one file
+        fd, part_path = tempfile.mkstemp(dir=os.path.dirname(dst), suffix=".part")
+        
+        try:
+            with self._session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                with os.fdopen(fd, 'wb') as f:
+                    fd = None
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if self._cancelled.is_set():
+                            raise InterruptedError("Download cancelled")
+                        f.write(chunk)
+            os.chmod(part_path, FILE_MODE)
+            os.replace(part_path, dst)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+    
+    def _process_item_download(self, item_id: str, metadata: Optional[Dict[str, Any]], pdf_files: List[str], download_dir: str,
+                               record_rows: Callable[[List[Dict[str, Any]]], None]):
+        """Record metadata rows for a single item and download the PDFs chosen for it"""
         try:
-            # Get metadata first to know what files we would download
-            metadata = self.get_item_metadata(item_id)
             if not metadata:
-                self.error_log.append(f"Failed to get metadata for item: {item_id}")
+                self.log_error(f"Failed to get metadata for item: {item_id}")
                 return
             
-            # Check what PDF files would be downloaded and if they exist
-            potential_pdf_files = [f.get('name', '') for f in metadata.get('files', []) if f.get('name', '').endswith('.pdf')]
-            
             # ALWAYS create metadata entries for all potential PDF files
             # This ensures we capture metadata for every item and every file
-            for pdf_file in potential_pdf_files:
+            item_fields = metadata.get('metadata', {})
+            metadata_entries = []
+            for pdf_file in self._pdf_names(metadata):
                 metadata_entry = {
                     'ItemID': item_id,
                     'FileName': pdf_file,
-                    'title': metadata.get('metadata', {}).get('title', ''),
-                    'creator': metadata.get('metadata', {}).get('creator', ''),
-                    'publisher': metadata.get('metadata', {}).get('publisher', ''),
-                    'date': metadata.get('metadata', {}).get('date', ''),
-                    'subject': metadata.get('metadata', {}).get('subject', ''),
-                    'language': metadata.get('metadata', {}).get('language', ''),
-                    'description': metadata.get('metadata', {}).get('description', ''),
-                    'call_number': metadata.get('metadata', {}).get('call number', '')
+                    'title': item_fields.get('title', ''),
+                    'creator': item_fields.get('creator', ''),
+                    'publisher': item_fields.get('publisher', ''),
+                    'date': item_fields.get('date', ''),
+                    'subject': item_fields.get('subject', ''),
+                    'language': item_fields.get('language', ''),
+                    'description': item_fields.get('description', ''),
+                    'call_number': item_fields.get('call number', '')
                 }
-                all_metadata.append(metadata_entry)
-            
-            # If no PDFs, we still captured the metadata, so return
-            if not potential_pdf_files:
-                return
-            
-            # If user selected "Skip All", don't download anything but metadata is already captured
-            if self.overwrite_action == OverwriteAction.SKIP_ALL:
-                return
+                metadata_entries.append(metadata_entry)
+            record_rows(metadata_entries)
             
-            # Check for conflicts before downloading anything
-            files_to_skip = []
-            should_download = False  # Track if we should download anything
-            
-            for pdf_file in potential_pdf_files:
-                dst = os.path.join(download_dir, pdf_file)
-                if os.path.exists(dst):
-                    if self.overwrite_action == OverwriteAction.SKIP_ALL:
-                        files_to_skip.append(pdf_file)
-                    elif self.overwrite_action == OverwriteAction.OVERWRITE_ALL:
-                        should_download = True
-                    else:
-                        # Prompt user for action
-                        action = self.prompt_overwrite_action(pdf_file, progress, task)
-                        
-                        if action == OverwriteAction.SKIP:
-                            files_to_skip.append(pdf_file)
-                        elif action == OverwriteAction.SKIP_ALL:
-                            # Skip this file and all future ones
-                            files_to_skip.append(pdf_file)
-                            return  # Exit early, don't process any more items
-                        else:  # OVERWRITE or OVERWRITE_ALL
-                            should_download = True
-                else:
-                    should_download = True  # New file, always download
-            
-            # If all files would be skipped, we still have metadata but no files to download
-            if len(files_to_skip) == len(potential_pdf_files):
-                return
-            
-            # If we have at least one file to process, download the item
-            if should_download or len(files_to_skip) < len(potential_pdf_files):
-                # Download PDFs to temporary subfolder
-                subprocess.run(
-                    ["ia", "download", item_id, "--glob=*.pdf"],
-                    cwd=os.getcwd(),
-                    capture_output=True,
-                    check=True
-                )
-                
-                # Check if temp directory was created
-                item_subdir = os.path.join(os.getcwd(), item_id)
-                if os.path.exists(item_subdir):
-                    # Find downloaded PDFs
-                    pdf_files = [f for f in os.listdir(item_subdir) if f.endswith('.pdf')]
-                    
-                    if pdf_files:
-                        # Move PDFs to final destination
-                        for pdf_file in pdf_files:
-                            # Skip files that user chose to skip
-                            if pdf_file in files_to_skip:
-                                continue
-                                
-                            src = os.path.join(item_subdir, pdf_file)
-                            dst = os.path.join(download_dir, pdf_file)
-                            shutil.move(src, dst)
-                    
-                    # Cleanup temp directory
-                    shutil.rmtree(item_subdir, ignore_errors=True)
+            for pdf_file in pdf_files:
+                if self._cancelled.is_set():
+                    return
+                self._download_pdf(item_id, pdf_file, os.path.join(download_dir, pdf_file))
                 
         except Exception as e:
-            self.error_log.append(f"Failed to process item: {item_id}. Error: {e}")
+            self.log_error(f"Failed to process item: {item_id}. Error: {e}")
     
-    def run(self):
-        """Main execution function"""
+    def run(self, query: Optional[str] = None, action: Optional[str] = None, download_dir: Optional[str] = None,
+            output_format: Optional[str] = None):
+        """Main execution function; any argument given replaces the matching interactive prompt"""
         try:
-            # Check if IA CLI is available
-            if not self.check_ia_command():
-                self.print_colored("Error: The Internet Archive CLI tool ('ia') is not installed or not in your PATH.", "red")
-                self.print_colored("Please install it by running: pip install internetarchive", "yellow")
-                sys.exit(1)
-            
             # Get search query
-            search_query = self.get_search_query()
+            search_query = query.strip() if query and query.strip() else self.get_search_query()
             
             # Search for items
             self.print_colored("\nSearching Internet Archive...", "yellow")
@@ -509,12 +988,17 @@ class IADownloader:
             self.print_colored(f"Found {len(item_list)} items matching your search.", "green")
             
             # Get user action
-            user_choice = self.get_user_action()
+            user_choice = ACTION_CHOICES[action] if action else self.get_user_action()
             
-            if user_choice == 1:
-                self.get_total_file_size(search_query, item_list)
-            elif user_choice == 2:
-                download_dir = self.get_download_directory()
+            if user_choice == "1":
+                self.get_total_file_size(search_query, item_list, output_format)
+            elif user_choice == "1a":
+                self.estimate_total_size(search_query, item_list)
+            elif user_choice == "2":
+                if download_dir is None:
+                    download_dir = self.get_download_directory()
+                else:
+                    download_dir = self.prepare_download_directory(download_dir)
                 self.download_files_and_create_metadata(search_query, item_list, download_dir)
                 
         except KeyboardInterrupt:
@@ -523,10 +1007,66 @@ class IADownloader:
         except Exception as e:
             self.print_colored(f"\nAn unexpected error occurred: {e}", "red")
             sys.exit(1)
+        finally:
+            self.close()
         
         self.print_colored("\nScript finished.", "cyan")
 
 
+def parse_duration(value: str) -> float:
+    """Parse a duration such as '30m', '12h' or '7d' into seconds"""
+    match = DURATION_RE.fullmatch(value.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}' (expected e.g. 30m, 12h, 7d)")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def positive_int(value: str) -> int:
+    """Parse a strictly positive integer such as a worker count"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Search the Internet Archive and download PDFs with metadata. "
+                    "Any option left out is asked for interactively."
+    )
+    parser.add_argument("-q", "--query", help="Internet Archive search query")
+    parser.add_argument("-a", "--action", choices=list(ACTION_CHOICES),
+                        help="size: exact PDF total, estimate: quick total of all files, download: fetch PDFs and metadata")
+    parser.add_argument("-d", "--dir", dest="download_dir", metavar="DIR",
+                        help="Download directory name, created under the current directory ('' for the current directory)")
+    parser.add_argument("--output-format", choices=REPORT_FORMATS + ["none"],
+                        help="Export the size report in this format without asking, or 'none' to skip it "
+                             "(parquet requires pyarrow)")
+    parser.add_argument("-y", "--yes", action="store_true", help="Start downloading without asking for confirmation")
+    parser.add_argument("--on-conflict", choices=["ask", "skip", "overwrite"], default="ask",
+                        help="What to do when a PDF already exists in the download directory (default: ask)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Do not read or write the metadata and search cache ({CACHE_PATH})")
+    parser.add_argument("--refresh-older-than", type=parse_duration, default="7d", metavar="DURATION",
+                        help="Refetch cached metadata older than this, e.g. 12h or 7d (default: 7d); "
+                             "cached search results are reused for at most an hour")
+    parser.add_argument("-j", "--jobs", type=positive_int, default=DOWNLOAD_WORKERS,
+                        help=f"Number of items to download in parallel (default: {DOWNLOAD_WORKERS})")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    downloader = IADownloader()
-    downloader.run()
\ No newline at end of file
+    args = parse_args()
+    conflict_actions = {"skip": OverwriteAction.SKIP, "overwrite": OverwriteAction.OVERWRITE}
+    downloader = IADownloader(
+        use_cache=not args.no_cache,
+        refresh_older_than=args.refresh_older_than,
+        jobs=args.jobs,
+        assume_yes=args.yes,
+        conflict_action=conflict_actions.get(args.on_conflict)
+    )
+    downloader.run(query=args.query, action=args.action, download_dir=args.download_dir, output_format=args.output_format)
\ No newline at end of file